@@ -0,0 +1,18 @@
+# Ahead-of-time compiles the sim_kernel.py kernels into the `sim_kernels` extension module.
+# Run once with Numba installed:  python build_kernels.py
+# sim_kernel.py then imports the compiled module instead of JIT-compiling at startup.
+# The build is for the current platform and Python version only, so rebuild after upgrading either.
+
+import os
+
+from numba.pycc import CC
+
+import sim_kernel
+
+cc = CC("sim_kernels")
+cc.output_dir = os.path.dirname(os.path.abspath(__file__)) # Next to sim_kernel.py
+for name, signature in sim_kernel.AOT_SIGNATURES.items():
+    cc.export(name, signature)(getattr(sim_kernel, f"_{name}"))
+
+if __name__ == "__main__":
+    cc.compile()
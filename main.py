@@ -1,9 +1,15 @@
 # Highlighted change: "immunity_duration": 600
 
 import pygame
-import random
 import math
-from collections import deque
+from dataclasses import dataclass, field
+
+import numpy as np
+
+try:
+    import sim_kernel # Numba-compiled kernels (optional)
+except ImportError: # Numba unavailable (e.g. in the pygbag web build): use the NumPy code paths
+    sim_kernel = None
 
 # --- Configuration Parameters ---
 WIDTH, HEIGHT = 900, 750  # Increased height for UI
@@ -66,211 +72,387 @@ VALUE_LIMITS = { # Min/Max limits for variables
     "immunity_duration": (0, 6000) # 0 means no immunity
 }
 
-# --- Global list for temporary effects ---
-active_flashes = []
-
-# --- Person Class ---
-class Person:
-    def __init__(self, x, y, status="healthy"):
-        self.x = x
-        self.y = y
-        self.radius = PERSON_RADIUS
-        self.status = status
-        self.infection_timer = 0
-        self.immunity_timer = 0 # New timer for immunity duration
-
-        self.angle = random.uniform(0, 2 * math.pi) # Store angle separately
+# --- Status Codes (stored as np.uint8) ---
+HEALTHY = 0
+INFECTED = 1
+RECOVERED = 2 # Represents the immune phase
+STATUS_COLORS = np.array([HEALTHY_COLOR, INFECTED_COLOR, RECOVERED_COLOR], dtype=np.uint8) # Row per status code
+
+# --- Helper: Effective Simulation Parameters ---
+def effective_sim_params():
+    """Returns (infection_duration, immunity_duration, infection_chance) from current_vars, ready for the tick.
+
+    These only change on button clicks, so callers cache the result instead of reading current_vars per frame.
+    """
+    effective_infection_duration = max(1, int(current_vars["infection_duration"])) # Ensure > 0
+    effective_immunity_duration = max(0, int(current_vars["immunity_duration"])) # Allow 0 immunity
+    return effective_infection_duration, effective_immunity_duration, float(current_vars["infection_chance"])
+
+# --- Sprite Atlas (pre-rendered at startup by build_sprites) ---
+RADIUS_VARIANTS = 3 # Integer body radii PERSON_RADIUS .. PERSON_RADIUS + 2 (infected pulsation)
+GLOW_ALPHAS = [max(0, int(GLOW_ALPHA / g)) for g in range(1, GLOW_LAYERS + 1)] # Alpha of glow layer g at [g - 1]
+BODY_SPRITES = {} # {status: [(surface, radius) per radius variant]}
+GLOW_SPRITES = {} # {status: [(surface, radius) or None per radius variant]}, all layers composited
+TRAIL_SPRITES = {} # {status: [surface or None per trail age (0 = newest)]}
+FLASH_SPRITES = [] # [(surface, radius) or None per flash timer]
+
+def _circle_sprite(color, radius, surface_radius=None):
+    """Returns an SRCALPHA surface (2*surface_radius square) with a centered circle."""
+    surface_radius = surface_radius or radius
+    surf = pygame.Surface((surface_radius * 2, surface_radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(surf, color, (surface_radius, surface_radius), radius)
+    return surf
+
+def build_sprites():
+    """Pre-renders every circle the draw code needs, so drawing is only table lookups and blits."""
+    for status, color in enumerate(map(tuple, STATUS_COLORS.tolist())):
+        BODY_SPRITES[status] = []
+        GLOW_SPRITES[status] = []
+        for variant in range(RADIUS_VARIANTS):
+            body_radius = PERSON_RADIUS + variant
+            BODY_SPRITES[status].append((_circle_sprite(color, body_radius), body_radius))
+
+            # Additively composite every glow layer into one sprite. Adding it to the screen gives the same
+            # pixels as adding each layer in turn, since both saturate at 255
+            layers = []
+            for g in range(GLOW_LAYERS, 0, -1):
+                glow_radius = int(body_radius + g * GLOW_EXPANSION)
+                current_glow_alpha = GLOW_ALPHAS[g - 1]
+                if glow_radius > 0 and current_glow_alpha > 0: # Invisible layers are left out
+                    layers.append((_circle_sprite((*color[:3], current_glow_alpha), glow_radius), glow_radius))
+            if layers:
+                max_glow_radius = max(glow_radius for _, glow_radius in layers)
+                glow_surf = pygame.Surface((max_glow_radius * 2, max_glow_radius * 2), pygame.SRCALPHA)
+                for layer_surf, glow_radius in layers:
+                    offset = max_glow_radius - glow_radius
+                    glow_surf.blit(layer_surf, (offset, offset), special_flags=pygame.BLEND_RGBA_ADD)
+                GLOW_SPRITES[status].append((glow_surf, max_glow_radius))
+            else:
+                GLOW_SPRITES[status].append(None)
+
+        TRAIL_SPRITES[status] = []
+        for t in range(TRAIL_LENGTH):
+            # Older positions fade in and shrink, ensure neither goes negative
+            safe_alpha = max(0, int(TRAIL_ALPHA_START * (t / TRAIL_LENGTH)))
+            current_trail_radius = int(PERSON_RADIUS * max(0.0, 1.0 - t / TRAIL_LENGTH))
+            TRAIL_SPRITES[status].append(
+                _circle_sprite((*color[:3], safe_alpha), current_trail_radius, PERSON_RADIUS)
+                if current_trail_radius > 0 and safe_alpha > 0 else None) # Nothing visible to blit
+
+    FLASH_SPRITES.clear()
+    for timer in range(FLASH_DURATION + 1):
+        progress = timer / FLASH_DURATION
+        current_radius = int(progress * FLASH_MAX_RADIUS)
+        alpha = int(200 * (1 - progress**2)) # Non-linear fade
+        FLASH_SPRITES.append((_circle_sprite((*FLASH_COLOR[:3], alpha), current_radius), current_radius)
+                             if alpha > 0 and current_radius > 0 else None)
+
+# --- Population (Structure of Arrays) ---
+@dataclass
+class Population:
+    """Holds the state of every person as parallel NumPy columns (index i = person i)."""
+    xs: np.ndarray
+    ys: np.ndarray
+    dxs: np.ndarray
+    dys: np.ndarray
+    status: np.ndarray
+    infection_timer: np.ndarray
+    immunity_timer: np.ndarray # Timer for immunity duration
+    # Trails: ring buffer of past (x, y) per person, shape (people, TRAIL_LENGTH, 2); column trail_head is written next
+    trail_buf: np.ndarray
+    trail_head: int = 0
+    trail_count: int = 0 # Number of columns filled so far (up to TRAIL_LENGTH)
+    rng: np.random.Generator = field(default_factory=np.random.default_rng) # Spawning and infection rolls
+
+    @classmethod
+    def create(cls, size, initial_infected, world_height, rng=None):
+        """Spawns `size` people above the UI area, the first `initial_infected` of them infected.
+
+        `rng` (a np.random.Generator, new one by default) drives spawning and every infection roll.
+        """
+        rng = rng if rng is not None else np.random.default_rng()
+        sim_area_height = world_height - UI_AREA_HEIGHT
+        headings = rng.uniform(0, 2 * math.pi, size) # Random unit velocity, scaled by update_speed
+        status = np.full(size, HEALTHY, dtype=np.uint8)
+        status[:initial_infected] = INFECTED
+        population = cls(
+            xs=rng.uniform(PERSON_RADIUS, WIDTH - PERSON_RADIUS, size),
+            ys=rng.uniform(PERSON_RADIUS, sim_area_height - PERSON_RADIUS, size),
+            dxs=np.cos(headings),
+            dys=np.sin(headings),
+            status=status,
+            infection_timer=np.zeros(size, dtype=np.int64),
+            immunity_timer=np.zeros(size, dtype=np.int64),
+            trail_buf=np.zeros((size, TRAIL_LENGTH, 2), dtype=np.float32),
+            rng=rng,
+        )
         # Access global dict directly for initial speed
-        self.update_speed(current_vars["move_speed"]) # Set initial velocity
-
-        self._set_color()
+        population.update_speed(current_vars["move_speed"]) # Set initial velocity
+        return population
 
-        if ENABLE_TRAILS:
-            self.trail = deque(maxlen=TRAIL_LENGTH)
-
-    def _set_color(self):
-        """Sets color based on status."""
-        if self.status == "healthy":
-            self.color = HEALTHY_COLOR
-        elif self.status == "infected":
-            self.color = INFECTED_COLOR
-        elif self.status == "recovered": # Represents the immune phase
-            self.color = RECOVERED_COLOR
-        self.glow_color = (*self.color, GLOW_ALPHA)
+    def __len__(self):
+        return len(self.xs)
 
     def update_speed(self, new_speed):
-        """Recalculates dx, dy based on stored angle and new speed."""
+        """Rescales every (dx, dy) to the new speed, keeping each direction."""
         # Use global limits directly
-        self.speed = max(VALUE_LIMITS["move_speed"][0], min(new_speed, VALUE_LIMITS["move_speed"][1])) # Apply limits
-        self.dx = math.cos(self.angle) * self.speed
-        self.dy = math.sin(self.angle) * self.speed
-
-    def move(self, world_height):
-        """Updates position and handles bouncing off walls (excluding UI area)."""
+        speed = max(VALUE_LIMITS["move_speed"][0], min(new_speed, VALUE_LIMITS["move_speed"][1])) # Apply limits
+        current_speed = np.hypot(self.dxs, self.dys)
+        scale = np.divide(speed, current_speed, out=np.zeros_like(current_speed), where=current_speed > 0)
+        self.dxs *= scale
+        self.dys *= scale
+
+    def step(self, world_height, infection_radius, sim_params):
+        """Advances everyone by one frame: move, update status, spread infection.
+
+        `sim_params` comes from effective_sim_params(). Uses the Numba kernels when available.
+        Returns the indices of the people infected this frame.
+        """
         if ENABLE_TRAILS:
-            self.trail.append((self.x, self.y))
+            self.trail_buf[:, self.trail_head, 0] = self.xs
+            self.trail_buf[:, self.trail_head, 1] = self.ys
+            self.trail_head = (self.trail_head + 1) % TRAIL_LENGTH
+            self.trail_count = min(self.trail_count + 1, TRAIL_LENGTH)
+
+        effective_infection_duration, effective_immunity_duration, infection_chance = sim_params
+
+        if sim_kernel is not None:
+            sim_kernel.step_move(self.xs, self.ys, self.dxs, self.dys,
+                                 WIDTH, world_height - UI_AREA_HEIGHT, PERSON_RADIUS)
+            sim_kernel.step_status(self.status, self.infection_timer, self.immunity_timer,
+                                   effective_infection_duration, effective_immunity_duration, RECOVERY_GRANTS_IMMUNITY)
+            newly_infected = np.nonzero(sim_kernel.step_infect(
+                self.xs, self.ys, self.status, self.infection_timer, self.immunity_timer,
+                infection_radius, infection_chance, self.rng.random(len(self))))[0]
+        else:
+            self.move(world_height)
+            self.update_status(effective_infection_duration, effective_immunity_duration)
+            newly_infected = self.spread_infection(infection_radius, infection_chance)
 
-        self.x += self.dx
-        self.y += self.dy
+        return newly_infected
 
-        # Update angle based on velocity - important if bouncing changes direction
-        current_angle = math.atan2(self.dy, self.dx)
+    def move(self, world_height):
+        """Updates positions and handles bouncing off walls (excluding UI area)."""
+        self.xs += self.dxs
+        self.ys += self.dys
 
         # Bounce off walls (top, left, right, and ceiling of simulation area)
-        bounce_dampening = 1.0 # Can adjust if needed
+        r = PERSON_RADIUS
         sim_area_height = world_height - UI_AREA_HEIGHT
-        bounced = False
-
-        if self.x <= self.radius:
-            self.dx = abs(self.dx) * bounce_dampening
-            self.x = self.radius
-            bounced = True
-        elif self.x >= WIDTH - self.radius:
-            self.dx = -abs(self.dx) * bounce_dampening
-            self.x = WIDTH - self.radius
-            bounced = True
-
-        if self.y <= self.radius:
-            self.dy = abs(self.dy) * bounce_dampening
-            self.y = self.radius
-            bounced = True
-        elif self.y >= sim_area_height - self.radius: # Bounce off UI boundary
-            self.dy = -abs(self.dy) * bounce_dampening
-            self.y = sim_area_height - self.radius
-            bounced = True
-
-        # Update angle only if bounce occurred to prevent drifting
-        if bounced:
-             self.angle = math.atan2(self.dy, self.dx)
-
-
-    def update_status(self, current_frame):
+
+        # Branchless: point the velocity away from any wall reached, then clamp back inside
+        self.dxs[:] = np.where(self.xs <= r, np.abs(self.dxs), np.where(self.xs >= WIDTH - r, -np.abs(self.dxs), self.dxs))
+        self.dys[:] = np.where(self.ys <= r, np.abs(self.dys), # Bounce off UI boundary below
+                               np.where(self.ys >= sim_area_height - r, -np.abs(self.dys), self.dys))
+        np.clip(self.xs, r, WIDTH - r, out=self.xs)
+        np.clip(self.ys, r, sim_area_height - r, out=self.ys)
+
+    def update_status(self, effective_infection_duration, effective_immunity_duration):
         """Updates infection and immunity timers, handles recovery and immunity waning."""
-        global current_vars # Need access to check durations
-
-        if self.status == "infected":
-            self.infection_timer += 1
-            effective_infection_duration = max(1, int(current_vars["infection_duration"])) # Ensure > 0
-            if self.infection_timer >= effective_infection_duration:
-                if RECOVERY_GRANTS_IMMUNITY:
-                    self.status = "recovered" # Enter immune state
-                    self.immunity_timer = 0 # Start immunity timer
-                else:
-                    self.status = "healthy" # Recover directly to susceptible
-                self.infection_timer = 0
-                self._set_color()
-
-        elif self.status == "recovered": # If currently immune
-             effective_immunity_duration = max(0, int(current_vars["immunity_duration"])) # Allow 0 immunity
-             if effective_immunity_duration == 0: # If duration is zero, immediately become healthy
-                 self.status = "healthy"
-                 self._set_color()
-                 self.immunity_timer = 0 # Reset timer
-             else:
-                self.immunity_timer += 1
-                if self.immunity_timer >= effective_immunity_duration:
-                    self.status = "healthy" # Immunity waned, become susceptible
-                    self.immunity_timer = 0
-                    self._set_color()
-
-        # Subtle pulsating effect for infected
-        if self.status == "infected":
-             pulsation = (math.sin(current_frame * 0.1) + 1) / 2
-             self.current_radius = self.radius + pulsation * 2
+        infected = self.status == INFECTED
+        immune = self.status == RECOVERED # Sampled before recoveries so they start counting next frame
+
+        self.infection_timer[infected] += 1
+        recovering = infected & (self.infection_timer >= effective_infection_duration)
+        if RECOVERY_GRANTS_IMMUNITY:
+            self.status[recovering] = RECOVERED # Enter immune state
+            self.immunity_timer[recovering] = 0 # Start immunity timer
         else:
-             self.current_radius = self.radius
+            self.status[recovering] = HEALTHY # Recover directly to susceptible
+        self.infection_timer[recovering] = 0
 
+        if effective_immunity_duration == 0: # If duration is zero, immediately become healthy
+            self.status[immune] = HEALTHY
+            self.immunity_timer[immune] = 0
+        else:
+            self.immunity_timer[immune] += 1
+            waned = immune & (self.immunity_timer >= effective_immunity_duration)
+            self.status[waned] = HEALTHY # Immunity waned, become susceptible
+            self.immunity_timer[waned] = 0
+
+    def _contacts(self, infection_radius):
+        """Returns the healthy end of every (infected, healthy) pair closer than infection_radius.
+
+        People are bucketed into a uniform grid with cells one infection radius wide, so each
+        infected person only needs distance checks against the 3x3 block of cells around it.
+        """
+        infection_radius_sq = infection_radius * infection_radius
+        infected = np.nonzero(self.status == INFECTED)[0]
+        if infected.size == 0:
+            return infected
+
+        # Cell key per person; one padding column on each side keeps neighbour keys from wrapping rows
+        grid_cols = int(WIDTH // infection_radius) + 3
+        cell_x = (self.xs // infection_radius).astype(np.int64) + 1
+        cell_y = (self.ys // infection_radius).astype(np.int64)
+        keys = cell_y * grid_cols + cell_x
+        order = np.argsort(keys, kind="stable")
+        sorted_keys = keys[order]
+
+        # [start, end) run of each neighbour cell of each infected person in the sorted order
+        neighbour_offsets = (np.arange(-1, 2)[:, None] * grid_cols + np.arange(-1, 2)[None, :]).ravel()
+        neighbour_keys = (keys[infected][:, None] + neighbour_offsets[None, :]).ravel()
+        starts = np.searchsorted(sorted_keys, neighbour_keys, side="left")
+        lengths = np.searchsorted(sorted_keys, neighbour_keys, side="right") - starts
+
+        # Expand the runs into flat (source, target) candidate pairs
+        sources = np.repeat(np.repeat(infected, len(neighbour_offsets)), lengths)
+        run_offsets = np.repeat(starts - (np.cumsum(lengths) - lengths), lengths)
+        targets = order[run_offsets + np.arange(lengths.sum())]
+
+        susceptible = self.status[targets] == HEALTHY
+        sources, targets = sources[susceptible], targets[susceptible]
+        # Squared distances against the squared radius, no sqrt needed
+        dx = self.xs[sources] - self.xs[targets]
+        dy = self.ys[sources] - self.ys[targets]
+        return targets[dx * dx + dy * dy < infection_radius_sq]
+
+    def spread_infection(self, infection_radius, infection_chance):
+        """Rolls an infection for every (infected, healthy) pair closer than infection_radius, in place.
+
+        Returns the indices of the people infected this frame.
+        """
+        targets = self._contacts(infection_radius)
+
+        # Apply infection chance to every candidate pair in one batch
+        hits = self.rng.random(len(targets)) < infection_chance
+        newly_infected = np.unique(targets[hits])
+
+        self.status[newly_infected] = INFECTED
+        self.infection_timer[newly_infected] = 0
+        self.immunity_timer[newly_infected] = 0 # Reset just in case
+        return newly_infected
+
+    def counts(self):
+        """Returns the number of people in each status, indexed by status code."""
+        return np.bincount(self.status, minlength=len(STATUS_COLORS))
+
+    def draw(self, screen, pulsation):
+        """Draws every person with trails and glow, one batched blits() call per layer.
+
+        `pulsation` (0..1) is the frame's shared pulse that grows the radius of infected people.
+        """
+        radius = PERSON_RADIUS
+        xs = self.xs.astype(int).tolist()
+        ys = self.ys.astype(int).tolist()
+        statuses = self.status.tolist()
+        # Only infected people pulsate, and they all share the same radius variant
+        infected_variant = min(int(pulsation * 2), RADIUS_VARIANTS - 1)
+        variants = np.where(self.status == INFECTED, infected_variant, 0).tolist()
+
+        # 1. Draw Trails
+        if ENABLE_TRAILS and self.trail_count > 1:
+            # Blit offsets of every stored position at once, reordered so index t = age (0 is the newest)
+            columns = (self.trail_head - 1 - np.arange(self.trail_count)) % TRAIL_LENGTH
+            offsets = (self.trail_buf[:, columns] - radius).astype(int)
+            blit_list = []
+            for t in range(self.trail_count):
+                sprites = [TRAIL_SPRITES[status][t] for status in range(len(STATUS_COLORS))]
+                if all(sprite is None for sprite in sprites):
+                    continue # Invisible at this age (zero alpha or radius) for every status
+                blit_list += [
+                    (sprites[status], (x, y)) for (x, y), status in zip(offsets[:, t].tolist(), statuses)
+                    if sprites[status] is not None
+                ]
+            screen.blits(blit_list, doreturn=0)
+
+        # 2. Draw Glows
+        if ENABLE_GLOW:
+            glows = [GLOW_SPRITES[status][variant] for status, variant in zip(statuses, variants)]
+            screen.blits([
+                (glow[0], (x - glow[1], y - glow[1]), None, pygame.BLEND_RGBA_ADD)
+                for x, y, glow in zip(xs, ys, glows) if glow is not None
+            ], doreturn=0)
+
+        # 3. Draw the main circles
+        bodies = [BODY_SPRITES[status][variant] for status, variant in zip(statuses, variants)]
+        screen.blits([
+            (body_surf, (x - main_rad, y - main_rad)) for x, y, (body_surf, main_rad) in zip(xs, ys, bodies)
+        ], doreturn=0)
+
+# --- Infection Flash Effects (Structure of Arrays) ---
+@dataclass
+class FlashEffects:
+    """Holds the active infection flashes as parallel NumPy columns (index i = flash i)."""
+    xs: np.ndarray = field(default_factory=lambda: np.empty(0))
+    ys: np.ndarray = field(default_factory=lambda: np.empty(0))
+    timers: np.ndarray = field(default_factory=lambda: np.empty(0, dtype=np.int64))
+
+    def add(self, xs, ys):
+        """Starts a new flash at each (x, y)."""
+        if len(xs):
+            self.xs = np.concatenate((self.xs, xs))
+            self.ys = np.concatenate((self.ys, ys))
+            self.timers = np.concatenate((self.timers, np.zeros(len(xs), dtype=np.int64)))
+
+    def update(self):
+        """Advances every flash timer and drops the finished flashes in one pass."""
+        self.timers += 1
+        keep = self.timers <= FLASH_DURATION
+        if not keep.all():
+            self.xs, self.ys, self.timers = self.xs[keep], self.ys[keep], self.timers[keep]
 
     def draw(self, screen):
-        """Draws the person with trails and glow."""
-        pos = (int(self.x), int(self.y))
-
-        # 1. Draw Trail
-        if ENABLE_TRAILS and len(self.trail) > 1:
-             for i, p_pos in enumerate(reversed(self.trail)):
-                 alpha = TRAIL_ALPHA_START * (i / TRAIL_LENGTH)
-                 # Ensure alpha doesn't go negative due to float inaccuracies
-                 safe_alpha = max(0, int(alpha))
-                 trail_color = (*self.color[:3], safe_alpha)
-                 # Calculate shrinking radius, ensure it's not negative
-                 trail_rad_factor = max(0.0, 1.0 - i / TRAIL_LENGTH)
-                 current_trail_radius = int(self.radius * trail_rad_factor)
-                 # Only draw if radius is positive
-                 if current_trail_radius > 0:
-                     trail_surf = pygame.Surface((self.radius*2, self.radius*2), pygame.SRCALPHA)
-                     pygame.draw.circle(trail_surf, trail_color, (self.radius, self.radius), current_trail_radius)
-                     screen.blit(trail_surf, (int(p_pos[0]-self.radius), int(p_pos[1]-self.radius)))
-
-        # 2. Draw Glow
-        if ENABLE_GLOW:
-            for i in range(GLOW_LAYERS, 0, -1):
-                glow_radius = int(self.current_radius + i * GLOW_EXPANSION)
-                if glow_radius <= 0: continue # Skip if radius is zero or negative
-
-                glow_surf = pygame.Surface((glow_radius * 2, glow_radius * 2), pygame.SRCALPHA)
-                current_glow_alpha = max(0, int(GLOW_ALPHA / i)) # Ensure non-negative alpha
-                if current_glow_alpha > 0:
-                    try:
-                        pygame.draw.circle(glow_surf, (*self.color[:3], current_glow_alpha), (glow_radius, glow_radius), glow_radius)
-                        screen.blit(glow_surf, (pos[0] - glow_radius, pos[1] - glow_radius), special_flags=pygame.BLEND_RGBA_ADD)
-                    except pygame.error: # Catch potential errors if radius/alpha are invalid somehow
-                        pass # Just skip drawing this glow layer
-
-        # 3. Draw the main circle
-        main_rad = int(self.current_radius)
-        if main_rad > 0:
-            pygame.draw.circle(screen, self.color, pos, main_rad)
-
-
-    def infect(self):
-        """Infects the person if they are susceptible ('healthy'). Returns True if infection occurred."""
-        global current_vars # Need access to infection chance
-        # Waning immunity logic means only 'healthy' are susceptible
-        if self.status == "healthy":
-            # Apply infection chance
-            if random.random() < current_vars["infection_chance"]:
-                old_status = self.status
-                self.status = "infected"
-                self.infection_timer = 0
-                self.immunity_timer = 0 # Reset just in case
-                self._set_color()
-
-                # Use global active_flashes list here (modification is okay without global keyword in this context)
-                if old_status != "infected" and ENABLE_INFECTION_FLASH:
-                     active_flashes.append({
-                         'x': self.x, 'y': self.y, 'timer': 0,
-                         'max_timer': FLASH_DURATION, 'max_radius': FLASH_MAX_RADIUS
-                     })
-                return True # Infection occurred
-        return False # No infection occurred
-
-
-    def distance_to(self, other_person):
-        return math.hypot(self.x - other_person.x, self.y - other_person.y)
-
-# --- Helper: Draw Background Gradient ---
-def draw_background(screen):
-    """Draws a vertical gradient."""
+        """Draws every flash with its pre-rendered sprite in one batched blits() call."""
+        blit_list = []
+        for x, y, timer in zip(self.xs.tolist(), self.ys.tolist(), self.timers.tolist()):
+            sprite = FLASH_SPRITES[timer]
+            if sprite is not None: # None once the flash has faded out
+                flash_surf, current_radius = sprite
+                blit_list.append((flash_surf, (int(x - current_radius), int(y - current_radius)), None, pygame.BLEND_RGBA_ADD))
+        screen.blits(blit_list, doreturn=0)
+
+# --- Helper: Background Gradient ---
+def create_background(size):
+    """Renders the vertical gradient once into a Surface that can be blitted every frame."""
+    screen_width, screen_height = size
+    background = pygame.Surface(size)
     try:
-        screen_height = screen.get_height()
-        screen_width = screen.get_width()
-        for y in range(screen_height):
-            # Interpolate color from top to bottom
-            ratio = y / screen_height
-            color = (
-                int(BACKGROUND_TOP[0] * (1 - ratio) + BACKGROUND_BOTTOM[0] * ratio),
-                int(BACKGROUND_TOP[1] * (1 - ratio) + BACKGROUND_BOTTOM[1] * ratio),
-                int(BACKGROUND_TOP[2] * (1 - ratio) + BACKGROUND_BOTTOM[2] * ratio)
-            )
-            pygame.draw.line(screen, color, (0, y), (screen_width, y))
+        # Interpolate color from top to bottom, one row per y
+        ratio = (np.arange(screen_height) / screen_height)[:, None]
+        gradient = np.array(BACKGROUND_TOP) * (1 - ratio) + np.array(BACKGROUND_BOTTOM) * ratio
+        pixels = pygame.surfarray.pixels3d(background) # Indexed [x, y, channel]
+        pixels[:] = gradient.astype(np.uint8)[None, :, :]
+        del pixels # Release the surface lock
     except Exception as e:
-        print(f"Error drawing background: {e}") # Basic error handling
+        print(f"Error creating background: {e}") # Basic error handling
+    return background
 
 
 # --- Helper: Draw UI ---
-def draw_ui(screen, font, ui_button_rects_map, mouse_pos):
-    """Draws the control UI at the bottom."""
+def new_ui_cache():
+    """Returns an empty UI cache; create one per pygame session (surfaces don't outlive pygame.quit())."""
+    # Rendered UI is reused until current_vars or the hovered button changes
+    return {"key": None, "surface": None, "glyphs": {}}
+
+def _ui_glyph(ui_cache, font, text):
+    """Returns the rendered surface for fixed UI text (labels, button signs), rendering it only once per font."""
+    glyphs = ui_cache["glyphs"]
+    if (font, text) not in glyphs:
+        glyphs[(font, text)] = font.render(text, True, UI_TEXT_COLOR)
+    return glyphs[(font, text)]
+
+def draw_ui(screen, font, ui_button_rects_map, mouse_pos, ui_cache):
+    """Draws the control UI at the bottom, re-rendering it only when its contents change."""
     ui_rect = pygame.Rect(0, HEIGHT - UI_AREA_HEIGHT, WIDTH, UI_AREA_HEIGHT)
+
+    # Which button (if any) is under the mouse: (var_name, 'minus' | 'plus')
+    hovered = None
+    for var_name, rects in ui_button_rects_map.items():
+        for kind, rect in rects.items():
+            if rect.collidepoint(mouse_pos):
+                hovered = (var_name, kind)
+
+    cache_key = (font, tuple(current_vars.items()), hovered)
+    if ui_cache["key"] != cache_key:
+        ui_cache["surface"] = render_ui(font, ui_button_rects_map, ui_rect, hovered, ui_cache)
+        ui_cache["key"] = cache_key
+
+    # Blit the entire UI surface onto the main screen
+    screen.blit(ui_cache["surface"], ui_rect.topleft)
+
+def render_ui(font, ui_button_rects_map, ui_rect, hovered, ui_cache):
+    """Renders the control UI into a new surface the size of ui_rect."""
     # Use SRCALPHA surface for transparency
     ui_surf = pygame.Surface(ui_rect.size, pygame.SRCALPHA)
     ui_surf.fill(UI_BG_COLOR)
@@ -289,7 +471,7 @@ def draw_ui(screen, font, ui_button_rects_map, mouse_pos):
     for var_name, display_name in var_display_names.items():
         # Label
         label_text = f"{display_name}:"
-        label_surf = font.render(label_text, True, UI_TEXT_COLOR)
+        label_surf = _ui_glyph(ui_cache, font, label_text)
         ui_surf.blit(label_surf, (x_offset, y_offset))
 
         # Value (formatted)
@@ -318,27 +500,23 @@ def draw_ui(screen, font, ui_button_rects_map, mouse_pos):
             global_minus_rect = ui_button_rects_map[var_name]['minus']
             global_plus_rect = ui_button_rects_map[var_name]['plus']
 
-            # Create local rects relative to the UI surface for drawing/hover check
+            # Create local rects relative to the UI surface for drawing
             minus_rect_local = global_minus_rect.move(-ui_rect.left, -ui_rect.top)
             plus_rect_local = global_plus_rect.move(-ui_rect.left, -ui_rect.top)
 
-            # Get mouse position relative to UI surface
-            mouse_local_x = mouse_pos[0] - ui_rect.left
-            mouse_local_y = mouse_pos[1] - ui_rect.top
-
             # Minus Button
-            is_hovering_minus = minus_rect_local.collidepoint(mouse_local_x, mouse_local_y)
+            is_hovering_minus = hovered == (var_name, 'minus')
             btn_color_minus = BUTTON_HOVER_COLOR if is_hovering_minus else BUTTON_COLOR
             pygame.draw.rect(ui_surf, btn_color_minus, minus_rect_local, border_radius=3)
-            minus_surf = font.render("-", True, UI_TEXT_COLOR)
+            minus_surf = _ui_glyph(ui_cache, font, "-")
             minus_rect_text = minus_surf.get_rect(center=minus_rect_local.center)
             ui_surf.blit(minus_surf, minus_rect_text)
 
             # Plus Button
-            is_hovering_plus = plus_rect_local.collidepoint(mouse_local_x, mouse_local_y)
+            is_hovering_plus = hovered == (var_name, 'plus')
             btn_color_plus = BUTTON_HOVER_COLOR if is_hovering_plus else BUTTON_COLOR
             pygame.draw.rect(ui_surf, btn_color_plus, plus_rect_local, border_radius=3)
-            plus_surf = font.render("+", True, UI_TEXT_COLOR)
+            plus_surf = _ui_glyph(ui_cache, font, "+")
             plus_rect_text = plus_surf.get_rect(center=plus_rect_local.center)
             ui_surf.blit(plus_surf, plus_rect_text)
 
@@ -348,32 +526,29 @@ def draw_ui(screen, font, ui_button_rects_map, mouse_pos):
 
         x_offset += LABEL_SPACING # Move to next variable's position
 
-
-    # Blit the entire UI surface onto the main screen
-    screen.blit(ui_surf, ui_rect.topleft)
+    return ui_surf
 
 
 # --- Simulation Functions ---
 def run_simulation():
     global current_vars # Allow modification of global dict
-    global active_flashes # <<< USE GLOBAL SCOPE for assignment below
 
     pygame.init()
     screen = pygame.display.set_mode((WIDTH, HEIGHT))
     pygame.display.set_caption("Interactive Virus Simulator")
+    background = create_background(screen.get_size()) # Static, so render it only once
+    build_sprites()
     clock = pygame.time.Clock()
     font_stats = pygame.font.Font(None, 30)
     font_ui = pygame.font.Font(None, 24)
+    ui_cache = new_ui_cache()
 
-    # Create population
-    people = []
-    for i in range(POPULATION_SIZE):
-        # Ensure people spawn above the UI area
-        sim_area_height = HEIGHT - UI_AREA_HEIGHT
-        x = random.uniform(PERSON_RADIUS, WIDTH - PERSON_RADIUS)
-        y = random.uniform(PERSON_RADIUS, sim_area_height - PERSON_RADIUS)
-        status = "infected" if i < INITIAL_INFECTED else "healthy"
-        people.append(Person(x, y, status))
+    # Create population (people spawn above the UI area)
+    rng = np.random.default_rng()
+    population = Population.create(POPULATION_SIZE, INITIAL_INFECTED, HEIGHT, rng)
+    flashes = FlashEffects()
+    sim_params = effective_sim_params() # Refreshed only when a button changes current_vars
+    infection_radius = PERSON_RADIUS * 3.0 # Consider making this dynamic later
 
     # --- Create UI Button Rects and Action List (Corrected Setup) ---
     ui_button_actions = [] # List: [(rect_object, (variable_name, delta))] for click detection
@@ -400,6 +575,7 @@ def run_simulation():
 
     running = True
     frame_count = 0
+    last_counts = None # Status counts the stats text was last rendered for
     while running:
         mouse_pos = pygame.mouse.get_pos() # Get mouse position once per frame
 
@@ -432,85 +608,49 @@ def run_simulation():
 
 
                             current_vars[var_name] = new_value
+                            sim_params = effective_sim_params()
 
                             # If move speed changed, update all people
                             if var_name == "move_speed":
-                                for person in people:
-                                    person.update_speed(new_value)
+                                population.update_speed(new_value)
                             break # Process only one button click
 
         # --- Update Logic ---
         frame_count += 1
-        for person in people:
-            person.move(HEIGHT) # Pass world height for boundary check
-            person.update_status(frame_count)
-
-        # --- Interaction & Infection Logic ---
-        infection_radius = PERSON_RADIUS * 3.0 # Consider making this dynamic later
-        for i in range(POPULATION_SIZE):
-            p1 = people[i]
-            # Optimization: Don't check pairs twice
-            for j in range(i + 1, POPULATION_SIZE):
-                p2 = people[j]
-
-                # Quick distance check approximation (Manhattan distance) - optional optimization
-                # if abs(p1.x - p2.x) > infection_radius or abs(p1.y - p2.y) > infection_radius:
-                #    continue
-
-                dist = p1.distance_to(p2)
-
-                if dist < infection_radius:
-                    # Try infection based on status (infect() method handles chance and susceptibility)
-                    if p1.status == "infected" and p2.status == "healthy":
-                        p2.infect()
-                    elif p2.status == "infected" and p1.status == "healthy":
-                        p1.infect()
+        # Movement, status timers, and interaction & infection logic in one tick
+        newly_infected = population.step(HEIGHT, infection_radius, sim_params) # Pass world height for boundary check
+        if ENABLE_INFECTION_FLASH:
+            flashes.add(population.xs[newly_infected], population.ys[newly_infected])
 
 
         # --- Update Flash Effects ---
-        flashes_to_remove = []
-        # This loop now correctly reads the global active_flashes
-        for flash in active_flashes:
-            flash['timer'] += 1
-            if flash['timer'] > flash['max_timer']:
-                flashes_to_remove.append(flash)
-        # This assignment now correctly modifies the global active_flashes
-        active_flashes = [f for f in active_flashes if f not in flashes_to_remove]
+        flashes.update()
 
 
         # --- Drawing ---
-        draw_background(screen)
+        screen.blit(background, (0, 0))
 
         # Draw flashes
-        for flash in active_flashes:
-             progress = flash['timer'] / flash['max_timer']
-             current_radius = int(progress * flash['max_radius'])
-             alpha = int(200 * (1 - progress**2)) # Non-linear fade
-             if alpha > 0 and current_radius > 0:
-                 try:
-                     flash_surf = pygame.Surface((current_radius*2, current_radius*2), pygame.SRCALPHA)
-                     pygame.draw.circle(flash_surf, (*FLASH_COLOR[:3], alpha), (current_radius, current_radius), current_radius)
-                     screen.blit(flash_surf, (int(flash['x'] - current_radius), int(flash['y'] - current_radius)), special_flags=pygame.BLEND_RGBA_ADD)
-                 except pygame.error: # Catch errors drawing flashes
-                     pass
+        flashes.draw(screen)
 
 
         # Draw people
-        for person in people:
-            person.draw(screen)
+        pulsation = (math.sin(frame_count * 0.1) + 1) / 2 # Subtle pulsating effect for infected
+        population.draw(screen, pulsation)
 
         # --- Draw UI ---
         # Pass the map needed for drawing, and current mouse pos for hover effect
-        draw_ui(screen, font_ui, ui_button_rects_map, mouse_pos)
+        draw_ui(screen, font_ui, ui_button_rects_map, mouse_pos, ui_cache)
 
         # --- Statistics ---
-        counts = {"healthy": 0, "infected": 0, "recovered": 0}
-        for person in people:
-            counts[person.status] += 1
-
-        healthy_text = font_stats.render(f"Healthy: {counts['healthy']}", True, HEALTHY_COLOR)
-        infected_text = font_stats.render(f"Infected: {counts['infected']}", True, INFECTED_COLOR)
-        recovered_text = font_stats.render(f"Immune: {counts['recovered']}", True, RECOVERED_COLOR) # Label reflects immunity
+        counts = tuple(population.counts().tolist())
+
+        # Re-render the text only when a count changed since the last frame
+        if counts != last_counts:
+            healthy_text = font_stats.render(f"Healthy: {counts[HEALTHY]}", True, HEALTHY_COLOR)
+            infected_text = font_stats.render(f"Infected: {counts[INFECTED]}", True, INFECTED_COLOR)
+            recovered_text = font_stats.render(f"Immune: {counts[RECOVERED]}", True, RECOVERED_COLOR) # Label reflects immunity
+            last_counts = counts
 
         # Stats position (top left)
         stats_bg_rect = pygame.Rect(5, 5, 200, 95)
@@ -0,0 +1,109 @@
+# Numba-compiled per-frame simulation kernels.
+# Optional: main.py falls back to its NumPy implementation when this module fails to import.
+# Uses the ahead-of-time build from build_kernels.py (sim_kernels) when present, so there is no
+# JIT warm-up at startup and Numba isn't needed at runtime; otherwise JIT-compiles the functions below.
+
+import numpy as np
+
+try:
+    from numba import njit, prange
+except ImportError: # Fine as long as the AOT build is available
+    njit = None
+    prange = range
+
+# Status codes (must match main.py)
+HEALTHY = 0
+INFECTED = 1
+RECOVERED = 2
+
+
+def _step_move(xs, ys, dxs, dys, width, sim_height, radius):
+    """Moves everyone by their velocity and bounces them off the walls, in place."""
+    for i in prange(xs.shape[0]):
+        x = xs[i] + dxs[i]
+        y = ys[i] + dys[i]
+
+        # Selects and min/max instead of branches, so the loop vectorizes
+        dxs[i] = abs(dxs[i]) if x <= radius else (-abs(dxs[i]) if x >= width - radius else dxs[i])
+        dys[i] = abs(dys[i]) if y <= radius else (-abs(dys[i]) if y >= sim_height - radius else dys[i]) # UI boundary below
+        xs[i] = min(max(x, radius), width - radius)
+        ys[i] = min(max(y, radius), sim_height - radius)
+
+
+def _step_status(status, infection_timer, immunity_timer, infection_duration, immunity_duration, grants_immunity):
+    """Advances infection and immunity timers and applies recovery / immunity waning, in place."""
+    for i in prange(status.shape[0]):
+        if status[i] == INFECTED:
+            infection_timer[i] += 1
+            if infection_timer[i] >= infection_duration:
+                if grants_immunity:
+                    status[i] = RECOVERED # Enter immune state
+                    immunity_timer[i] = 0 # Start immunity timer
+                else:
+                    status[i] = HEALTHY # Recover directly to susceptible
+                infection_timer[i] = 0
+
+        elif status[i] == RECOVERED:
+            if immunity_duration == 0: # If duration is zero, immediately become healthy
+                status[i] = HEALTHY
+                immunity_timer[i] = 0
+            else:
+                immunity_timer[i] += 1
+                if immunity_timer[i] >= immunity_duration:
+                    status[i] = HEALTHY # Immunity waned, become susceptible
+                    immunity_timer[i] = 0
+
+
+def _step_infect(xs, ys, status, infection_timer, immunity_timer, infection_radius, infection_chance, rolls):
+    """Infects healthy people near infected ones, in place. Returns a mask of the newly infected.
+
+    Each healthy person j with k infected contacts gets one roll from `rolls[j]` against
+    1 - (1 - infection_chance)**k, which is the same as rolling every contact separately.
+    """
+    n = xs.shape[0]
+    infection_radius_sq = infection_radius * infection_radius # Compare squared distances, no sqrt
+    newly_infected = np.zeros(n, dtype=np.bool_)
+
+    # Parallel over targets: each iteration only writes its own slot
+    for j in prange(n):
+        if status[j] != HEALTHY:
+            continue
+        contacts = 0
+        for i in range(n):
+            if status[i] != INFECTED:
+                continue
+            dx = xs[i] - xs[j]
+            dy = ys[i] - ys[j]
+            # Quick bounding-box reject before the exact check
+            if abs(dx) > infection_radius or abs(dy) > infection_radius:
+                continue
+            if dx * dx + dy * dy < infection_radius_sq:
+                contacts += 1
+        if contacts > 0 and rolls[j] < 1.0 - (1.0 - infection_chance) ** contacts:
+            newly_infected[j] = True
+
+    # Apply afterwards so this frame's new cases don't spread until the next frame
+    for j in range(n):
+        if newly_infected[j]:
+            status[j] = INFECTED
+            infection_timer[j] = 0
+            immunity_timer[j] = 0 # Reset just in case
+    return newly_infected
+
+
+# Exported signatures for the ahead-of-time build (see build_kernels.py)
+AOT_SIGNATURES = {
+    "step_move": "void(f8[:], f8[:], f8[:], f8[:], f8, f8, f8)",
+    "step_status": "void(u1[:], i8[:], i8[:], i8, i8, b1)",
+    "step_infect": "b1[:](f8[:], f8[:], u1[:], i8[:], i8[:], f8, f8, f8[:])",
+}
+
+try:
+    from sim_kernels import step_move, step_status, step_infect # Built by build_kernels.py
+except ImportError:
+    if njit is None:
+        raise ImportError("sim_kernel needs Numba or the sim_kernels module built by build_kernels.py")
+    _jit = njit(cache=True, fastmath=True, parallel=True)
+    step_move = _jit(_step_move)
+    step_status = _jit(_step_status)
+    step_infect = _jit(_step_infect)